@@ -1,9 +1,7 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.preprocessing import MinMaxScaler
-import geopandas as gpd
+import preprocessing
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -13,43 +11,27 @@ st.set_page_config(
 )
 
 # --- LOAD DATA WITH CACHE ---
-@st.cache_data
+DATA_DIR = "Srilanka/District_Dashboard"
+PROCESSED_DIR = f"{DATA_DIR}/processed"
+CSV_PATH = f"{DATA_DIR}/District_Data_Modified.csv"
+SHP_PATH = f"{DATA_DIR}/lka_admbnda_adm2_slsd_20220816.shp"
+DBF_PATH = f"{DATA_DIR}/lka_admbnda_adm2_slsd_20220816.dbf"
+
+# Cached as a resource so the GeoDataFrame and GeoJSON are not pickled per rerun
+@st.cache_resource
 def load_data():
-    # Original data (actual values)
-    df = pd.read_csv("Srilanka/District_Dashboard/District_Data_Modified.csv")
-    # Load shapefile
-    shp_path = "Srilanka/District_Dashboard/lka_admbnda_adm2_slsd_20220816.shp"
-    gdf = gpd.read_file(shp_path)
-    return df, gdf
-
-df, gdf = load_data()
+    # Prebuilt tables from build_processed.py, unless missing or stale; else rebuild from the raw CSV + shapefile
+    if preprocessing.processed_is_fresh(PROCESSED_DIR, [CSV_PATH, SHP_PATH, DBF_PATH]):
+        return preprocessing.read_processed(PROCESSED_DIR)
+    df = preprocessing.read_values(CSV_PATH)
+    gdf = preprocessing.read_districts(SHP_PATH)
+    return preprocessing.process(df, gdf)
 
-# --- DATA PREPROCESSING FOR SCORING ---
+df, scaled_data, merged, geojson_data = load_data()
+# Only merged and geojson_data are shared by reference; the small pandas frames are per-rerun copies
+df, scaled_data = df.copy(), scaled_data.copy()
 
 features = df.columns[1:]  # all parameters except district name
-scaler = MinMaxScaler()
-scaled_data = df.copy()
-scaled_data[features] = scaler.fit_transform(df[features])
-
-# Define good and bad parameters
-good = ['Rain_dist_Mean_Rainfall_mm', 'District_Mean_NDVI_2020_2025_Mean_NDVI',
-        'canopy_dist_Mean_Canopy_Height', 'treeloss_treecover_Mean_TreeCover2000']
-bad = ['co_dist_Mean_CO', 'District_Mean_NO2_2019_2024_Mean_NO2',
-       'treeloss_treecover_Forest_Loss_km2', 'District_Mean_SI_2020_2025_Mean_SI']
-
-# Invert bad parameters
-for b in bad:
-    scaled_data[b] = 1 - scaled_data[b]
-
-# Composite score
-scaled_data['Environmental_Score'] = scaled_data[good + bad].mean(axis=1)
-scaled_data['Rank'] = scaled_data['Environmental_Score'].rank(ascending=False, method='min').astype(int)
-
-# --- MERGE ALL ORIGINAL PARAMS INTO GEO DATAFRAME FOR MAPPING ---
-
-# Merge original data (df) + scaled_data scoring columns to gdf for map & table use
-merged = gdf.merge(df, on='ADM2_EN')  # original actual parameters
-merged = merged.merge(scaled_data[['ADM2_EN', 'Environmental_Score', 'Rank']], on='ADM2_EN')
 
 # --- SIDEBAR ---
 
@@ -102,51 +84,53 @@ st.subheader("📊 District Rankings by Environmental Score")
 ranked = scaled_data[['Rank', 'ADM2_EN', 'Environmental_Score']].sort_values('Rank').reset_index(drop=True)
 ranked['Environmental_Score'] = ranked['Environmental_Score'].round(3)
 
-def rank_badge(rank):
-    if rank == 1:
-        return "🥇"
-    elif rank == 2:
-        return "🥈"
-    elif rank == 3:
-        return "🥉"
-    else:
-        return ""
-
-ranked['Rank Badge'] = ranked['Rank'].apply(rank_badge)
-
-st.dataframe(
-    ranked.style.highlight_max(subset=['Environmental_Score'], color='#85C1E9')
-          .format({"Environmental_Score": "{:.3f}"})
-          .set_properties(**{'text-align': 'center'}),
-    use_container_width=True
-)
+rank_badges = {1: "🥇", 2: "🥈", 3: "🥉"}
+ranked['Rank Badge'] = ranked['Rank'].map(rank_badges).fillna("")
+
+# Styled tables are rendered to HTML once; class="dataframe" picks up the table CSS above
+@st.cache_data
+def render_ranked_html(ranked):
+    return (ranked.style.highlight_max(subset=['Environmental_Score'], color='#85C1E9')
+                  .format({"Environmental_Score": "{:.3f}"})
+                  .set_properties(**{'text-align': 'center'})
+                  .to_html(table_attributes='class="dataframe"'))
+
+st.markdown(render_ranked_html(ranked), unsafe_allow_html=True)
 
 st.markdown("🏆 **Top 3 Districts:**")
-for idx, row in ranked.head(3).iterrows():
-    st.markdown(f"{row['Rank Badge']} **{row['ADM2_EN']}** — Score: {row['Environmental_Score']}")
+st.markdown("\n\n".join(
+    f"{row['Rank Badge']} **{row['ADM2_EN']}** — Score: {row['Environmental_Score']}"
+    for _, row in ranked.head(3).iterrows()
+))
 
 # Bar chart for ranking
 st.subheader("🏆 Environmental Scores by District")
-fig_bar = px.bar(
-    ranked,
-    x='Environmental_Score',
-    y='ADM2_EN',
-    orientation='h',
-    color='Environmental_Score',
-    color_continuous_scale='YlGnBu',
-    labels={'Environmental_Score': 'Env. Score', 'ADM2_EN': 'District'},
-    title="District Environmental Score Ranking"
-)
-fig_bar.update_layout(yaxis=dict(autorange='reversed'))
+@st.cache_resource
+def make_bar(ranked):
+    fig_bar = px.bar(
+        ranked,
+        x='Environmental_Score',
+        y='ADM2_EN',
+        orientation='h',
+        color='Environmental_Score',
+        color_continuous_scale='YlGnBu',
+        labels={'Environmental_Score': 'Env. Score', 'ADM2_EN': 'District'},
+        title="District Environmental Score Ranking"
+    )
+    fig_bar.update_layout(yaxis=dict(autorange='reversed'))
+    return fig_bar
+
+fig_bar = make_bar(ranked)
 st.plotly_chart(fig_bar, use_container_width=True)
 
 # Radar chart for comparison
 if district_options:
     st.subheader("🕸️ District Profile Comparison (Radar Chart)")
     fig_radar = go.Figure()
+    # Use scaled_data for normalized radar values, indexed by district for label lookups
+    radar_src = scaled_data.set_index('ADM2_EN')[list(features)]
     for dist in district_options:
-        # Use scaled_data for normalized radar values
-        row = scaled_data[scaled_data['ADM2_EN'] == dist].iloc[0][features]
+        row = radar_src.loc[dist]
         fig_radar.add_trace(go.Scatterpolar(
             r=row.values,
             theta=row.index,
@@ -163,30 +147,53 @@ if district_options:
 # District-wise parameter table & map (show original values, NOT scaled)
 st.subheader(f"🔍 District-wise Values & Map for Parameter: {selected_param}")
 
-param_table = merged[['ADM2_EN', selected_param]].sort_values(selected_param, ascending=False).reset_index(drop=True)
+# Per-parameter tables sorted once per process; a parameter switch is a dict lookup
+@st.cache_resource
+def sorted_by_param(_merged, _df, _features):
+    values = preprocessing.values_for(_merged, _df)
+    return {p: values[['ADM2_EN', p]].sort_values(p, ascending=False).reset_index(drop=True) for p in _features}
 
-st.dataframe(
-    param_table.style.background_gradient(
-        subset=[selected_param],
-        cmap='YlGnBu'
-    ).set_properties(**{'text-align': 'center'}),
-    use_container_width=True
-)
+param_table = sorted_by_param(merged, df, features)[selected_param]
 
-fig_map = px.choropleth_mapbox(
-    merged,
-    geojson=merged.geometry,
-    locations=merged.index,
-    color=selected_param,
-    hover_name='ADM2_EN',
-    color_continuous_scale='YlGnBu',
-    mapbox_style="carto-positron",
-    zoom=7,
-    center={"lat": 7.8731, "lon": 80.7718},
-    opacity=0.7,
-    labels={selected_param: selected_param}
-)
-fig_map.update_geos(fitbounds="locations", visible=False)
-fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
+@st.cache_data
+def render_param_html(param, _param_table):
+    return _param_table.style.background_gradient(
+        subset=[param],
+        cmap='YlGnBu'
+    ).set_properties(**{'text-align': 'center'}).to_html(table_attributes='class="dataframe"')
+
+st.markdown(render_param_html(selected_param, param_table), unsafe_allow_html=True)
+
+# Geometry, style and camera are built once; uirevision keeps zoom/pan across parameter switches
+@st.cache_resource
+def make_base_map(_merged, _geojson):
+    fig_map = go.Figure(go.Choroplethmapbox(
+        geojson=_geojson,
+        locations=_merged['id'],
+        text=_merged['ADM2_EN'],
+        colorscale='YlGnBu',
+        marker_opacity=0.7
+    ))
+    fig_map.update_layout(
+        mapbox_style="carto-positron",
+        mapbox_zoom=7,
+        mapbox_center={"lat": 7.8731, "lon": 80.7718},
+        margin={"r":0,"t":0,"l":0,"b":0},
+        uirevision='keep'
+    )
+    return fig_map
+
+# Only the z values and labels change with the selected parameter
+@st.cache_resource
+def make_map(param, _merged, _df, _geojson):
+    fig_map = go.Figure(make_base_map(_merged, _geojson))
+    fig_map.update_traces(
+        z=preprocessing.values_for(_merged, _df)[param].values,
+        colorbar_title_text=param,
+        hovertemplate="<b>%{text}</b><br>" + param + "=%{z}<extra></extra>",
+        selector=dict(type='choroplethmapbox')
+    )
+    return fig_map
 
+fig_map = make_map(selected_param, merged, df, geojson_data)
 st.plotly_chart(fig_map, use_container_width=True)
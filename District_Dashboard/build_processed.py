@@ -0,0 +1,14 @@
+# Precompute the dashboard tables so the app can skip CSV/shapefile parsing on cold start.
+# Re-run whenever the CSV, the shapefile, preprocessing.py or scoring.py changes:
+#     python District_Dashboard/build_processed.py
+import os
+import preprocessing
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+if __name__ == "__main__":
+    df = preprocessing.read_values(os.path.join(DATA_DIR, "District_Data_Modified.csv"))
+    gdf = preprocessing.read_districts(os.path.join(DATA_DIR, "lka_admbnda_adm2_slsd_20220816.shp"))
+    out_dir = os.path.join(DATA_DIR, "processed")
+    preprocessing.write_processed(out_dir, *preprocessing.process(df, gdf))
+    print(f"Wrote processed data to {out_dir}")
@@ -0,0 +1,84 @@
+import gzip
+import json
+import logging
+import os
+import pandas as pd
+import geopandas as gpd
+
+# --- LOAD RAW DATA ---
+
+def read_values(csv_path):
+    # Original data (actual values), kept float64 for display; only the scoring matrix is float32
+    return pd.read_csv(csv_path)
+
+def read_districts(shp_path):
+    gdf = gpd.read_file(shp_path, engine="pyogrio", use_arrow=True)
+    # Simplify boundaries (~500 m) and snap to 5 decimals; finer detail is invisible at zoom 6-7
+    gdf['geometry'] = gdf.geometry.simplify(tolerance=0.005, preserve_topology=True).set_precision(1e-5)
+    return gdf
+
+# --- MERGE SCORES INTO GEO DATAFRAME FOR MAPPING ---
+
+def merge_scores(gdf, scaled_data):
+    # Shared categorical key so the merge joins on integer codes instead of hashing strings
+    districts = pd.CategoricalDtype(categories=sorted(set(gdf['ADM2_EN']) | set(scaled_data['ADM2_EN'])))
+    geo = gdf[['ADM2_EN', 'geometry']].astype({'ADM2_EN': districts})
+    scores = scaled_data[['ADM2_EN', 'Environmental_Score', 'Rank']].astype({'ADM2_EN': districts})
+    # Merge only the scoring columns into gdf; original parameters are attached on demand by the app
+    merged = geo.merge(scores, on='ADM2_EN')
+    merged['id'] = merged.index.astype(str)
+    return merged
+
+def values_for(merged, df):
+    # Original (actual) parameter values, one row per map feature in merged's row order
+    return df.set_index('ADM2_EN').loc[merged['ADM2_EN']].reset_index()
+
+def build_geojson(merged):
+    # Feature ids are the stringified index, matching merged['id']
+    return json.loads(merged.geometry.to_json())
+
+def process(df, gdf):
+    # Imported here so loading prebuilt tables never pays for importing numba
+    from scoring import score_districts
+    scaled_data = score_districts(df)
+    merged = merge_scores(gdf, scaled_data)
+    return df, scaled_data, merged, build_geojson(merged)
+
+# --- PROCESSED DATA ON DISK ---
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_FILES = ('values.parquet', 'scaled_data.parquet', 'merged.parquet', 'geojson.json.gz')
+
+# The code that produces the processed files; editing it invalidates them like a data change
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_SOURCES = (os.path.join(CODE_DIR, 'preprocessing.py'), os.path.join(CODE_DIR, 'scoring.py'))
+
+def processed_is_fresh(out_dir, sources):
+    # Usable only if every file was built and none of the data or code sources changed since
+    paths = [os.path.join(out_dir, name) for name in PROCESSED_FILES]
+    if not all(os.path.exists(path) for path in paths):
+        return False
+    built = min(os.path.getmtime(path) for path in paths)
+    stale = [src for src in (*sources, *CODE_SOURCES) if os.path.getmtime(src) > built]
+    if stale:
+        logger.warning("Processed data in %s is older than %s; rerun build_processed.py. "
+                       "Falling back to the raw CSV and shapefile.", out_dir, ", ".join(stale))
+        return False
+    return True
+
+def write_processed(out_dir, df, scaled_data, merged, geojson_data):
+    os.makedirs(out_dir, exist_ok=True)
+    df.to_parquet(os.path.join(out_dir, 'values.parquet'))
+    scaled_data.to_parquet(os.path.join(out_dir, 'scaled_data.parquet'))
+    merged.to_parquet(os.path.join(out_dir, 'merged.parquet'))
+    with gzip.open(os.path.join(out_dir, 'geojson.json.gz'), 'wt', encoding='utf-8') as f:
+        json.dump(geojson_data, f)
+
+def read_processed(out_dir):
+    df = pd.read_parquet(os.path.join(out_dir, 'values.parquet'))
+    scaled_data = pd.read_parquet(os.path.join(out_dir, 'scaled_data.parquet'))
+    merged = gpd.read_parquet(os.path.join(out_dir, 'merged.parquet'))
+    with gzip.open(os.path.join(out_dir, 'geojson.json.gz'), 'rt', encoding='utf-8') as f:
+        geojson_data = json.load(f)
+    return df, scaled_data, merged, geojson_data
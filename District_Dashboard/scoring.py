@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from numba import njit
+
+# Define good and bad parameters
+good = ['Rain_dist_Mean_Rainfall_mm', 'District_Mean_NDVI_2020_2025_Mean_NDVI',
+        'canopy_dist_Mean_Canopy_Height', 'treeloss_treecover_Mean_TreeCover2000']
+bad = ['co_dist_Mean_CO', 'District_Mean_NO2_2019_2024_Mean_NO2',
+       'treeloss_treecover_Forest_Loss_km2', 'District_Mean_SI_2020_2025_Mean_SI']
+
+# --- SCORING ---
+
+# Per-column min and range, the fitted state of a MinMaxScaler; NaNs are ignored as MinMaxScaler does
+@njit(cache=True)
+def fit_minmax(x):
+    n, m = x.shape
+    data_min = np.zeros(m)
+    data_range = np.ones(m)
+    for j in range(m):
+        mn = np.inf
+        mx = -np.inf
+        for i in range(n):
+            v = x[i, j]
+            if np.isnan(v):
+                continue
+            mn = min(mn, v)
+            mx = max(mx, v)
+        if mn > mx:
+            continue  # all-NaN column: leave it NaN after scaling
+        data_min[j] = mn
+        # constant columns scale to 0, as MinMaxScaler does
+        data_range[j] = mx - mn if mx > mn else 1.0
+    return data_min, data_range
+
+# Descending rank with ties sharing the lowest rank, like Series.rank(ascending=False, method='min').
+# Districts without any score sort (and rank) last.
+@njit(cache=True)
+def rank_desc(score):
+    order = np.argsort(np.where(np.isnan(score), np.inf, -score), kind='mergesort')
+    rank = np.empty(score.shape[0], dtype=np.int64)
+    for k in range(order.shape[0]):
+        if k > 0 and score[order[k]] == score[order[k - 1]]:
+            rank[order[k]] = rank[order[k - 1]]
+        else:
+            rank[order[k]] = k + 1
+    return rank
+
+# Min-max scale each column in place with a fitted min/range, invert bad
+# parameters and accumulate the composite score in a single jitted pass, then rank it.
+# Missing values are skipped in the row mean, like DataFrame.mean(axis=1).
+@njit(cache=True)
+def score_kernel(x, data_min, data_range, bad_mask, score_mask):
+    n, m = x.shape
+    score = np.zeros(n)
+    n_scored = np.zeros(n)
+    for j in range(m):
+        for i in range(n):
+            v = (x[i, j] - data_min[j]) / data_range[j]
+            if bad_mask[j]:
+                v = 1.0 - v
+            x[i, j] = v
+            if score_mask[j] and not np.isnan(v):
+                score[i] += v
+                n_scored[i] += 1
+    for i in range(n):
+        score[i] = score[i] / n_scored[i] if n_scored[i] > 0 else np.nan
+    return score, rank_desc(score)
+
+def score_districts(df):
+    features = df.columns[1:]  # all parameters except district name
+    x = df[features].to_numpy(dtype=np.float32, copy=True)
+    data_min, data_range = fit_minmax(x)
+    score, rank = score_kernel(x, data_min, data_range, features.isin(bad), features.isin(good + bad))
+    scaled = pd.DataFrame(x, columns=features, index=df.index)
+    scaled.insert(0, 'ADM2_EN', df['ADM2_EN'])
+    scaled['Environmental_Score'] = score
+    scaled['Rank'] = rank
+    return scaled